@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of rendered responses with a time-to-live, keyed by method, path and query string.
+    Eviction is bounded both by entry count and by the total size of the cached bodies, and bodies larger than
+    max_entry_bytes are never stored.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300, max_bytes=64 * 2 ** 20, max_entry_bytes=4 * 2 ** 20):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def cacheable(self, size):
+        return size <= min(self.max_entry_bytes, self.max_bytes)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.size -= len(entry['body'])
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry['stored_at'] > self.ttl:
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, body, status_code, headers):
+        entry = {
+            'body': body,
+            'status_code': status_code,
+            'headers': headers,
+            'etag': etag(body),
+            'stored_at': time.monotonic(),
+        }
+        if not self.cacheable(len(body)):
+            return entry
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = entry
+            self.size += len(body)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+def etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, tag):
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or tag in candidates or f'W/{tag}' in candidates
@@ -1,7 +1,135 @@
-from fastapi import APIRouter
+import io
+import json
+from datetime import date
+from typing import Literal, Optional
+
+import numpy as np
+import pyarrow as pa
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
 router = APIRouter()
 
 @router.get("/")
 def read_welcome():
-    return {"message": "Welcome to the backend!"}
\ No newline at end of file
+    return {"message": "Welcome to the backend!"}
+
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MAX_BATCH_SYMBOLS = 500
+
+
+def get_store(request: Request):
+    store = request.app.state.features
+    if store is None:
+        raise HTTPException(status_code=503, detail="Feature store is not loaded, run the pipeline first")
+    return store
+
+
+def get_symbol(request: Request, symbol: str):
+    features = get_store(request).get(symbol)
+    if features is None:
+        raise HTTPException(status_code=404, detail=f"Unknown symbol {symbol}")
+    return features
+
+
+@router.get("/stocks/{symbol}/features")
+def read_features(request: Request, symbol: str, start: Optional[date] = None, end: Optional[date] = None):
+    features = get_symbol(request, symbol)
+    return {"symbol": features.symbol, **features.company, "features": features.records(start, end)}
+
+
+@router.get("/stocks/{symbol}/predict")
+def read_prediction(request: Request, symbol: str):
+    store = get_store(request)
+    if not store.model_sets:
+        raise HTTPException(status_code=503, detail="No trained models are loaded, run python -m app.model.train first")
+    features = get_symbol(request, symbol)
+    prediction, model = store.predict(features)
+    if prediction is None:
+        raise HTTPException(status_code=404, detail=f"No trained model covers {symbol}")
+    return {
+        "symbol": features.symbol,
+        "as_of": str(features.dates[-1]),
+        "predicted_percentchange": prediction,
+        "model": model,
+    }
+
+
+def parse_batch(symbols, start=None, end=None):
+    """
+    Parses "AAPL,MSFT:2015-01-01:2016-01-01,XOM::2019-12-31" into {symbol: (start, end)}. A symbol's own bounds
+    override the request's start / end, an empty or missing bound falls back to them. The first range given for
+    a symbol wins.
+    """
+    ranges = {}
+    for item in symbols.split(","):
+        symbol, *bounds = [part.strip() for part in item.split(":")]
+        if not symbol:
+            continue
+        if len(bounds) > 2:
+            raise HTTPException(status_code=400, detail=f"Expected SYMBOL[:start[:end]], got {item!r}")
+        try:
+            bounds = [date.fromisoformat(bound) if bound else None for bound in bounds] + [None, None]
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid date in {item!r}, expected YYYY-MM-DD")
+        ranges.setdefault(symbol.upper(), (bounds[0] or start, bounds[1] or end))
+    return ranges
+
+
+# the batch payloads take (features, start, end) triples, so every symbol is sliced to its own range
+def arrow_payload(ranges):
+    symbols = [features for features, _, _ in ranges]
+    slices = [features.slice(start, end) for features, start, end in ranges]
+    columns = symbols[0].columns if symbols else []
+    lengths = [len(dates) for dates, _ in slices]
+
+    values = np.concatenate([v for _, v in slices]) if slices else np.empty((0, len(columns)))
+    table = pa.table({
+        "symbol": pa.DictionaryArray.from_arrays(
+            np.repeat(np.arange(len(symbols), dtype=np.int32), lengths),
+            pa.array([features.symbol for features in symbols], type=pa.string()),
+        ),
+        "date": pa.array(np.concatenate([d for d, _ in slices]) if slices else np.array([], dtype="datetime64[D]")),
+        **{column: pa.array(values[:, i], from_pandas=True) for i, column in enumerate(columns)},
+    })
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def ndjson_lines(ranges):
+    # one JSON object per (symbol, date) row, rendered in chunks so long histories are never built in full
+    for features, start, end in ranges:
+        for records in features.record_chunks(start, end):
+            yield "".join(json.dumps({"symbol": features.symbol, **record}) + "\n" for record in records)
+
+
+@router.get("/stocks/batch")
+def read_batch(
+    request: Request,
+    symbols: str = Query(..., description="Comma separated symbols, each optionally SYMBOL:start:end"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    format: Literal["json", "arrow", "ndjson"] = "json",
+):
+    store = get_store(request)
+    requested = parse_batch(symbols, start, end)
+    if len(requested) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SYMBOLS} symbols per request")
+
+    found = [(store.get(symbol), lo, hi) for symbol, (lo, hi) in requested.items()]
+    missing = [symbol for symbol, (features, _, _) in zip(requested, found) if features is None]
+    found = [entry for entry in found if entry[0] is not None]
+
+    if format == "arrow":
+        return Response(arrow_payload(found), media_type=ARROW_MEDIA_TYPE)
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(found), media_type=NDJSON_MEDIA_TYPE)
+    return {
+        "missing": missing,
+        "symbols": {features.symbol: features.columns_payload(lo, hi) for features, lo, hi in found},
+    }
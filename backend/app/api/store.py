@@ -0,0 +1,101 @@
+import numpy as np
+
+from ..model.registry import load_models
+from ..pipeline.cache import StageCache
+from ..pipeline.features import TECHNICAL_COLUMNS
+from ..pipeline.run import FINAL_STAGE, STAGE_VERSIONS
+
+
+FEATURE_COLUMNS = ['Open', 'Volume', 'S&P500', 'Percentchange', 'positive_sentiment', 'negative_sentiment',
+                   'positive_relevance', 'negative_relevance'] + TECHNICAL_COLUMNS
+COMPANY_COLUMNS = ['Shortname', 'Longname', 'Sector', 'Industry']
+
+
+# JSON has no NaN, missing values are served as null
+def _floats(values):
+    return [None if value != value else value for value in values.tolist()]
+
+
+class SymbolFeatures:
+    """
+    One symbol's feature history as sorted NumPy arrays, so a date range is two binary searches and a slice.
+    """
+
+    def __init__(self, symbol, company, dates, values, columns):
+        self.symbol = symbol
+        self.company = company
+        self.dates = dates
+        self.values = values
+        self.columns = columns
+
+    def slice(self, start=None, end=None):
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left')
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right')
+        return self.dates[lo:hi], self.values[lo:hi]
+
+    def _records(self, dates, values):
+        return [
+            {'date': str(date), **dict(zip(self.columns, _floats(row)))}
+            for date, row in zip(dates.astype('datetime64[D]'), values)
+        ]
+
+    def records(self, start=None, end=None):
+        return self._records(*self.slice(start, end))
+
+    def record_chunks(self, start=None, end=None, chunk_rows=1000):
+        dates, values = self.slice(start, end)
+        for lo in range(0, len(dates), chunk_rows):
+            yield self._records(dates[lo:lo + chunk_rows], values[lo:lo + chunk_rows])
+
+    def columns_payload(self, start=None, end=None):
+        dates, values = self.slice(start, end)
+        payload = {'date': dates.astype('datetime64[D]').astype(str).tolist()}
+        for i, column in enumerate(self.columns):
+            payload[column] = _floats(values[:, i])
+        return payload
+
+    def predict(self, model_sets=()):
+        """
+        Predicts the next day's Percentchange from the latest row with the most specific trained model that
+        covers this symbol. Returns (prediction, model name), or (None, None) when no model covers it.
+        """
+        if len(self.dates) == 0:
+            return None, None
+
+        for model_set in model_sets:
+            model = model_set.model_for(self.symbol, self.company.get('Sector'))
+            if model is not None and all(column in self.columns for column in model_set.features):
+                latest = self.values[-1, [self.columns.index(c) for c in model_set.features]]
+                return float(model.predict(latest[None, :])[0]), f'ridge-{(model_set.group_by or "global").lower()}'
+        return None, None
+
+
+class FeatureStore:
+    """
+    In-memory feature store indexed by (symbol, date), built once from the pipeline's cached final stage.
+    """
+
+    def __init__(self, final_df, model_sets=()):
+        self.model_sets = list(model_sets)
+        final_df = final_df.sort_values(['Symbol', 'Date'], kind='stable')
+        columns = [column for column in FEATURE_COLUMNS if column in final_df.columns]
+
+        self.symbols = {}
+        for symbol, group in final_df.groupby('Symbol', observed=True, sort=False):
+            company = {column: str(group[column].iloc[0]) for column in COMPANY_COLUMNS if column in group.columns}
+            self.symbols[str(symbol)] = SymbolFeatures(str(symbol), company,
+                                                       group['Date'].to_numpy().astype('datetime64[D]'),
+                                                       group[columns].to_numpy(dtype=np.float64), columns)
+
+    @classmethod
+    def load(cls, cache_dir='cache', models_dir='models'):
+        final_df = StageCache(cache_dir).load_latest(FINAL_STAGE, STAGE_VERSIONS[FINAL_STAGE])
+        if final_df is None:
+            return None
+        return cls(final_df, load_models(models_dir))
+
+    def predict(self, features):
+        return features.predict(self.model_sets)
+
+    def get(self, symbol):
+        return self.symbols.get(symbol.upper())
@@ -1,9 +1,59 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from .api import routes
+from .api.cache import ResponseCache, etag_matches
+from .api.store import FeatureStore
+
+
+# load the pipeline's features once at startup, handlers only read from memory
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  app.state.features = FeatureStore.load(
+    os.environ.get("FEATURES_CACHE_DIR", "cache"),
+    os.environ.get("MODELS_DIR", "models"),
+  )
+  app.state.responses.clear()
+  yield
+
+app = FastAPI(lifespan=lifespan)
+app.state.responses = ResponseCache(
+  max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", "1024")),
+  ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "300")),
+  max_bytes=int(os.environ.get("RESPONSE_CACHE_BYTES", str(64 * 2 ** 20))),
+  max_entry_bytes=int(os.environ.get("RESPONSE_CACHE_ENTRY_BYTES", str(4 * 2 ** 20))),
+)
 
-app = FastAPI()
+# serve repeated GET /stocks queries from memory, and answer 304 when the client already has the same body
+@app.middleware("http")
+async def cache_responses(request: Request, call_next):
+  if request.method != "GET" or not request.url.path.startswith("/stocks"):
+    return await call_next(request)
 
+  cache = request.app.state.responses
+  key = f"{request.url.path}?{request.url.query}"
+  entry = cache.get(key)
+
+  if entry is None:
+    response = await call_next(request)
+    # streamed responses (NDJSON), errors and bodies too large to cache pass straight through
+    if response.status_code != 200 or response.headers.get("content-type", "").startswith(routes.NDJSON_MEDIA_TYPE) \
+        or not cache.cacheable(int(response.headers.get("content-length", 0))):
+      return response
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = {"content-type": response.headers.get("content-type", "application/json")}
+    entry = cache.put(key, body, response.status_code, headers)
+
+  headers = {**entry["headers"], "etag": entry["etag"], "cache-control": "no-cache"}
+  if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+    return Response(status_code=304, headers={"etag": entry["etag"], "cache-control": "no-cache"})
+  return Response(content=entry["body"], status_code=entry["status_code"], headers=headers)
+
+
+# added after the cache middleware so CORS wraps it and cached responses still get CORS headers
 app.add_middleware(
   CORSMiddleware,
   allow_origins=["http://localhost:3000"],
@@ -14,6 +64,7 @@ app.add_middleware(
 
 app.include_router(routes.router)
 
+
 @app.get("/")
 def read_root():
-  return {"message": "[root] Backend is running!"}
\ No newline at end of file
+  return {"message": "[root] Backend is running!"}
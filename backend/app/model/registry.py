@@ -0,0 +1,61 @@
+import json
+import os
+
+from .ridge import RidgeModel
+
+
+GLOBAL_GROUP = '__all__'
+
+
+class ModelSet:
+    """
+    Trained models for one grouping (a single global model, one per Sector, or one per Symbol), along with the
+    feature columns they expect, in order.
+    """
+
+    def __init__(self, group_by, features, models, metrics=None):
+        self.group_by = group_by
+        self.features = features
+        self.models = models
+        self.metrics = metrics or {}
+
+    def model_for(self, symbol=None, sector=None):
+        if self.group_by == 'Symbol':
+            return self.models.get(symbol)
+        if self.group_by == 'Sector':
+            return self.models.get(sector)
+        return self.models.get(GLOBAL_GROUP)
+
+    def save(self, models_dir='models'):
+        os.makedirs(models_dir, exist_ok=True)
+        path = os.path.join(models_dir, f'ridge-{(self.group_by or "global").lower()}.json')
+        payload = {
+            'group_by': self.group_by,
+            'features': self.features,
+            'metrics': self.metrics,
+            'models': {group: model.to_dict() for group, model in self.models.items()},
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            payload = json.load(f)
+        models = {group: RidgeModel.from_dict(params) for group, params in payload['models'].items()}
+        return cls(payload['group_by'], payload['features'], models, payload.get('metrics'))
+
+
+def load_models(models_dir='models'):
+    """
+    Loads every saved model set in models_dir, most specific grouping first (Symbol, then Sector, then global).
+    """
+    if not os.path.isdir(models_dir):
+        return []
+    model_sets = [ModelSet.load(os.path.join(models_dir, name))
+                  for name in sorted(os.listdir(models_dir)) if name.startswith('ridge-') and name.endswith('.json')]
+    order = {'Symbol': 0, 'Sector': 1, None: 2}
+    return sorted(model_sets, key=lambda model_set: order.get(model_set.group_by, 3))
@@ -0,0 +1,48 @@
+import warnings
+
+import numpy as np
+
+
+class RidgeModel:
+    """
+    Ridge regression on standardized features. Missing feature values are imputed with the training mean.
+    """
+
+    def __init__(self, intercept, coef, mean, scale):
+        self.intercept = float(intercept)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+    @classmethod
+    def fit(cls, X, y, alpha=1.0):
+        X = X.astype(np.float64)
+        # all-NaN columns warn here, they end up with mean 0 and scale 1
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean = np.nanmean(X, axis=0)
+            scale = np.nanstd(X, axis=0)
+        mean = np.where(np.isfinite(mean), mean, 0.0)
+        scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+
+        Z = np.nan_to_num((X - mean) / scale)
+        intercept = y.mean()
+        A = Z.T @ Z + alpha * np.eye(Z.shape[1])
+        coef = np.linalg.solve(A, Z.T @ (y - intercept))
+        return cls(intercept, coef, mean, scale)
+
+    def predict(self, X):
+        Z = np.nan_to_num((np.asarray(X, dtype=np.float64) - self.mean) / self.scale)
+        return self.intercept + Z @ self.coef
+
+    def to_dict(self):
+        return {
+            'intercept': self.intercept,
+            'coef': self.coef.tolist(),
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, params):
+        return cls(params['intercept'], params['coef'], params['mean'], params['scale'])
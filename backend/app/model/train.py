@@ -0,0 +1,246 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from ..pipeline.cache import StageCache
+from ..pipeline.features import TECHNICAL_COLUMNS
+from ..pipeline.run import FINAL_STAGE, STAGE_VERSIONS
+from .registry import GLOBAL_GROUP, ModelSet
+from .ridge import RidgeModel
+
+
+MODEL_FEATURES = ['Percentchange', 'positive_sentiment', 'negative_sentiment', 'positive_relevance',
+                  'negative_relevance'] + TECHNICAL_COLUMNS
+GROUPINGS = {'global': None, 'sector': 'Sector', 'symbol': 'Symbol'}
+
+
+# DESIGN MATRIX
+
+def design_matrix(final_df, group_by=None):
+    """
+    Sorts the feature frame by (group, Date) and returns the arrays the folds train on: features X, the next
+    trading day's Percentchange of the same symbol as y, the row's date and its target's date (as day numbers),
+    plus each group's [lo, hi) row range.
+    """
+    df = final_df.sort_values(['Symbol', 'Date'], kind='stable')
+    by_symbol = df.groupby('Symbol', observed=True, sort=False)
+    df = df.assign(target=by_symbol['Percentchange'].shift(-1), target_date=by_symbol['Date'].shift(-1))
+
+    groups = df[group_by].astype(str) if group_by else pd.Series(GLOBAL_GROUP, index=df.index)
+    df = df.assign(group=groups).sort_values(['group', 'Date'], kind='stable').reset_index(drop=True)
+
+    arrays = {
+        'X': df[MODEL_FEATURES].to_numpy(dtype=np.float32),
+        'y': df['target'].to_numpy(dtype=np.float64),
+        'date': df['Date'].to_numpy().astype('datetime64[D]').astype(np.int64),
+        # rows without a next day get a target date no fold can reach
+        'target_date': df['target_date'].to_numpy().astype('datetime64[D]').astype(np.int64),
+    }
+    arrays['target_date'][df['target_date'].isna().to_numpy()] = np.iinfo(np.int64).max
+
+    boundaries = np.flatnonzero(np.r_[True, df['group'].to_numpy()[1:] != df['group'].to_numpy()[:-1], True])
+    ranges = {df['group'].iat[lo]: (lo, hi) for lo, hi in zip(boundaries[:-1], boundaries[1:]) if lo < len(df)}
+    return df, arrays, ranges
+
+
+def walk_forward_folds(dates, min_train_years=2):
+    # expanding window, one test year per fold: train on every earlier year, test on the year
+    years = np.unique(dates.astype('datetime64[D]').astype('datetime64[Y]'))
+    return [(year.astype('datetime64[D]').astype(np.int64), (year + 1).astype('datetime64[D]').astype(np.int64))
+            for year in years[min_train_years:]]
+
+
+# SHARED MEMORY
+
+class SharedArrays:
+    """
+    Copies arrays into shared memory once so pool workers can map them without pickling or copying.
+    """
+
+    def __init__(self, arrays):
+        self.blocks = []
+        self.specs = {}
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+
+    def view(self, name):
+        block_name, shape, dtype = self.specs[name]
+        block = next(block for block in self.blocks if block.name == block_name)
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+_arrays = {}
+_blocks = []
+
+
+def _attach(specs):
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _blocks.append(block)
+        _arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# TASKS
+
+def _metrics(y, predictions):
+    errors = predictions - y
+    return {
+        'rmse': float(np.sqrt(np.mean(errors ** 2))) if len(y) else np.nan,
+        'mae': float(np.mean(np.abs(errors))) if len(y) else np.nan,
+        'hit_rate': float(np.mean(np.sign(predictions) == np.sign(y))) if len(y) else np.nan,
+        'baseline_rmse': float(np.sqrt(np.mean(y ** 2))) if len(y) else np.nan,
+    }
+
+
+def _run_fold(task):
+    group, lo, hi, start, end, alpha = task
+    X, y, date, target_date = _arrays['X'], _arrays['y'], _arrays['date'], _arrays['target_date']
+
+    # rows are date sorted within the group, so each fold is found by binary search
+    cut = lo + np.searchsorted(date[lo:hi], start, side='left')
+    stop = lo + np.searchsorted(date[lo:hi], end, side='left')
+
+    # purge training rows whose next-day target falls inside the test year
+    train = np.arange(lo, cut)
+    train = train[(target_date[train] < start) & np.isfinite(y[train])]
+    test = np.arange(cut, stop)
+    test = test[np.isfinite(y[test])]
+
+    result = {'group': group, 'start': start, 'end': end, 'n_train': len(train), 'n_test': len(test)}
+    if len(train) <= X.shape[1] or len(test) == 0:
+        return result
+
+    model = RidgeModel.fit(X[train], y[train], alpha)
+    predictions = model.predict(X[test])
+    _arrays['predictions'][test] = predictions
+    result.update(_metrics(y[test], predictions))
+    return result
+
+
+def _fit_group(task):
+    group, lo, hi, alpha = task
+    X, y = _arrays['X'], _arrays['y']
+    rows = np.arange(lo, hi)
+    rows = rows[np.isfinite(y[rows])]
+    if len(rows) <= X.shape[1]:
+        return group, None
+    return group, RidgeModel.fit(X[rows], y[rows], alpha).to_dict()
+
+
+def _map(func, tasks, shared, workers):
+    if workers == 1:
+        _arrays.update({name: shared.view(name) for name in shared.specs})
+        try:
+            return [func(task) for task in tasks]
+        finally:
+            _arrays.clear()
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shared.specs,)) as pool:
+        return list(pool.map(func, tasks, chunksize=chunksize))
+
+
+# BACKTEST / TRAIN
+
+def backtest(final_df, group_by=None, alpha=1.0, min_train_years=2, workers=None):
+    """
+    Walk-forward backtest of a ridge model per group predicting next-day Percentchange. Every (fold, group)
+    pair is fitted in a process pool over shared-memory arrays. Returns the per fold/group metrics and the
+    out-of-sample predictions aligned with the sorted design frame.
+    """
+    workers = workers or os.cpu_count() or 1
+    df, arrays, ranges = design_matrix(final_df, group_by)
+    arrays['predictions'] = np.full(len(df), np.nan)
+
+    tasks = [(group, lo, hi, start, end, alpha)
+             for start, end in walk_forward_folds(arrays['date'], min_train_years)
+             for group, (lo, hi) in ranges.items()]
+
+    shared = SharedArrays(arrays)
+    try:
+        results = _map(_run_fold, tasks, shared, workers)
+        predictions = shared.view('predictions').copy()
+    finally:
+        shared.close()
+
+    metrics = pd.DataFrame(results)
+    if not metrics.empty:
+        metrics['start'] = metrics['start'].astype('datetime64[D]')
+        metrics['end'] = metrics['end'].astype('datetime64[D]')
+    return metrics, df.assign(prediction=predictions)
+
+
+def summarize(predictions_df):
+    scored = predictions_df[predictions_df['prediction'].notna() & predictions_df['target'].notna()]
+    by_year = scored.groupby(scored['Date'].dt.year)
+    summary = pd.DataFrame({
+        'rows': by_year.size(),
+        'rmse': by_year.apply(lambda g: np.sqrt(np.mean((g['prediction'] - g['target']) ** 2))),
+        'baseline_rmse': by_year.apply(lambda g: np.sqrt(np.mean(g['target'] ** 2))),
+        'hit_rate': by_year.apply(lambda g: np.mean(np.sign(g['prediction']) == np.sign(g['target']))),
+    })
+    overall = _metrics(scored['target'].to_numpy(), scored['prediction'].to_numpy())
+    return summary, {'rows': len(scored), **overall}
+
+
+def train_models(final_df, group_by=None, alpha=1.0, workers=None):
+    workers = workers or os.cpu_count() or 1
+    df, arrays, ranges = design_matrix(final_df, group_by)
+    tasks = [(group, lo, hi, alpha) for group, (lo, hi) in ranges.items()]
+
+    shared = SharedArrays(arrays)
+    try:
+        results = _map(_fit_group, tasks, shared, workers)
+    finally:
+        shared.close()
+
+    models = {group: RidgeModel.from_dict(params) for group, params in results if params is not None}
+    return ModelSet(group_by, MODEL_FEATURES, models)
+
+
+def load_features(cache_dir='cache'):
+    final_df = StageCache(cache_dir).load_latest(FINAL_STAGE, STAGE_VERSIONS[FINAL_STAGE])
+    if final_df is None:
+        raise SystemExit(f'No {FINAL_STAGE} stage in {cache_dir}, run the pipeline first')
+    return final_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward backtest and training of next-day return models.')
+    parser.add_argument('--cache-dir', default='cache')
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--group-by', choices=sorted(GROUPINGS), default='global')
+    parser.add_argument('--alpha', type=float, default=1.0)
+    parser.add_argument('--min-train-years', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    final_df = load_features(args.cache_dir)
+    group_by = GROUPINGS[args.group_by]
+
+    start = time.perf_counter()
+    _, predictions_df = backtest(final_df, group_by, args.alpha, args.min_train_years, args.workers)
+    summary, overall = summarize(predictions_df)
+    print(summary.to_string())
+    print(f'overall: {overall}  ({time.perf_counter() - start:.1f}s)')
+
+    model_set = train_models(final_df, group_by, args.alpha, args.workers)
+    model_set.metrics = overall
+    print(f'saved {len(model_set.models)} model(s) to {model_set.save(args.models_dir)}')
+
+
+if __name__ == '__main__':
+    main()
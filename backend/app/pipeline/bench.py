@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+
+from . import stages
+from .run import FeaturePipeline
+from .synthetic import BASE_HEADLINES, append_news, synthetic_final, synthetic_news, write_dataset
+
+
+# the original aggregation, kept only to benchmark against: each group's headlines are zipped against the
+#   score column of the whole frame, so they are paired with the scores of the first rows instead of their own
+def aggregate_daily_legacy(news_df):
+    return news_df.groupby('date').agg(
+        positive_sentiment = ('positive_sentiment', 'sum'),
+        negative_sentiment = ('negative_sentiment', 'sum'),
+        positive_headline = ('headline', lambda x: ' '.join(h for h, s in zip(x, news_df['sentiment_score']) if s > 0)),
+        negative_headline = ('headline', lambda x: ' '.join(h for h, s in zip(x, news_df['sentiment_score']) if s < 0))
+        ).reset_index()
+
+
+# the original row-wise relevance, kept only to benchmark against
+def calculate_relevance_legacy(row):
+    relevant_words = [row['Symbol'], row['Shortname'], row['Longname'], row['Sector'], row['Industry']]
+    positive_words = str(row['positive_headline']).lower().split()
+    negative_words = str(row['negative_headline']).lower().split()
+    positive_relevance_count = sum(word.lower() in positive_words for word in relevant_words)
+    negative_relevance_count = sum(word.lower() in negative_words for word in relevant_words)
+    total_positive_words = len(positive_words)
+    total_negative_words = len(negative_words)
+    positive_relevance_score = positive_relevance_count / total_positive_words if total_positive_words > 0 else 0
+    negative_relevance_score = negative_relevance_count / total_negative_words if total_negative_words > 0 else 0
+    return pd.Series([positive_relevance_score, negative_relevance_score])
+
+
+def check_daily_alignment(news_df, daily_df):
+    # every day's headline text must be exactly that day's positive/negative headlines, in order
+    daily_df = daily_df.set_index('date')
+    for date, group in news_df.groupby('date'):
+        expected_positive = ' '.join(group.loc[group['sentiment_score'] > 0, 'headline'])
+        expected_negative = ' '.join(group.loc[group['sentiment_score'] < 0, 'headline'])
+        assert daily_df.at[date, 'positive_headline'] == expected_positive, date
+        assert daily_df.at[date, 'negative_headline'] == expected_negative, date
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_daily_aggregation(rows=200_000):
+    news_df = synthetic_news(rows)
+
+    daily_df, seconds = timed(stages.aggregate_daily, news_df)
+    legacy_df, legacy_seconds = timed(aggregate_daily_legacy, news_df)
+    check_daily_alignment(news_df, daily_df)
+
+    misaligned = (daily_df['positive_headline'] != legacy_df['positive_headline']).mean()
+    print(f'aggregate_daily         {rows:>9,} headlines  {seconds:8.3f}s')
+    print(f'aggregate_daily_legacy  {rows:>9,} headlines  {legacy_seconds:8.3f}s  ({misaligned:.0%} of days misaligned)')
+    print(f'speedup                 {legacy_seconds / seconds:.1f}x')
+    return seconds, legacy_seconds
+
+
+def bench_relevance(symbols=500, days=2500, legacy_rows=5_000):
+    final_df = synthetic_final(symbols, days)
+    rows = len(final_df)
+
+    _, seconds = timed(stages.relevance, final_df)
+
+    # the row-wise version is linear in rows, so time it on a sample and scale up
+    sample = final_df.sample(min(legacy_rows, rows), random_state=0)
+    _, legacy_seconds = timed(lambda df: df.apply(calculate_relevance_legacy, axis=1), sample)
+    estimate = legacy_seconds * rows / len(sample)
+
+    print(f'relevance               {rows:>9,} rows       {seconds:8.3f}s')
+    print(f'relevance_legacy        {len(sample):>9,} rows       {legacy_seconds:8.3f}s  (~{estimate:.0f}s at {rows:,})')
+    print(f'speedup                 ~{estimate / seconds:.0f}x')
+    return seconds, estimate
+
+
+def _pipeline_runs(scale, seed=0):
+    # runs in a fresh process per scale, so peak RSS is not inherited from a larger run
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        paths = write_dataset(root, scale, seed)
+        generate_seconds = time.perf_counter() - start
+        cache_dir = os.path.join(root, 'cache')
+
+        reports = {}
+        for run in ['cold', 'warm', 'append']:
+            if run == 'append':
+                # 1% more news lines on existing days, picked up incrementally
+                append_news(paths, max(1, BASE_HEADLINES * scale // 100), seed + 1)
+            pipeline = FeaturePipeline(cache_dir=cache_dir, **paths)
+            pipeline.run()
+            reports[run] = pipeline.profiler.report()
+
+    return {'scale': scale, 'generate_seconds': round(generate_seconds, 3), 'runs': reports}
+
+
+def bench_pipeline(scales=(1, 10, 100), seed=0):
+    results = []
+    for scale in scales:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            result = pool.submit(_pipeline_runs, scale, seed).result()
+        results.append(result)
+
+        print(f'\n{scale}x  (synthetic data written in {result["generate_seconds"]:.1f}s)')
+        print(f'{"stage":<16}{"rows":>12}' + ''.join(f'{run + " s":>12}' for run in result['runs']) + f'{"cold MB":>10}')
+        cold = result['runs']['cold']['stages']
+        for i, record in enumerate(cold):
+            seconds = ''.join(f'{runs["stages"][i]["seconds"]:>12.3f}' for runs in result['runs'].values())
+            print(f'{record["stage"]:<16}{record["rows"]:>12,}{seconds}{record["peak_rss_mb"]:>10.1f}')
+        totals = ''.join(f'{runs["total_seconds"]:>12.3f}' for runs in result['runs'].values())
+        print(f'{"total":<16}{"":>12}{totals}{result["runs"]["cold"]["peak_rss_mb"]:>10.1f}')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the feature pipeline on synthetic data.')
+    parser.add_argument('--suite', choices=['micro', 'pipeline', 'all'], default='all')
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--days', type=int, default=2500)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--output', help='write the pipeline results as JSON to this path')
+    args = parser.parse_args()
+
+    if args.suite in ('micro', 'all'):
+        bench_daily_aggregation(args.rows)
+        bench_relevance(args.symbols, args.days)
+
+    if args.suite in ('pipeline', 'all'):
+        results = bench_pipeline(args.scales)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+# fingerprint a source file cheaply (size + mtime), used as part of stage keys
+def fingerprint(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+
+def make_key(*parts):
+    payload = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+# concatenates frames without losing categorical dtypes to object when the frames' categories differ
+def concat_frames(frames):
+    frames = list(frames)
+    for column in frames[0].columns:
+        if all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = union_categoricals([frame[column] for frame in frames]).categories
+            frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+# one pass over the file, returning the digest of its first prefix_size bytes and of the whole file
+def _digests(path, prefix_size=0):
+    digest = hashlib.sha256()
+    prefix = None
+    read = 0
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(min(1 << 20, prefix_size - read) if read < prefix_size else 1 << 20)
+            if not block:
+                break
+            digest.update(block)
+            read += len(block)
+            if read == prefix_size:
+                prefix = digest.copy().hexdigest()
+    return prefix, digest.hexdigest()
+
+
+class StageCache:
+    """
+    Stores each pipeline stage's output as a Parquet file named after the stage and a hash of its inputs.
+    A small manifest remembers, per stage, the last key written and what it was built from, so later runs
+    can tell whether a stage can be reused as is, extended with appended rows, or has to be rebuilt.
+    """
+
+    def __init__(self, root='cache'):
+        self.root = root
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {}
+
+    def path(self, stage, key):
+        return os.path.join(self.root, f'{stage}-{key}.parquet')
+
+    def load(self, stage, key):
+        path = self.path(stage, key)
+        if not os.path.exists(path):
+            return None
+        return pd.read_parquet(path, memory_map=True)
+
+    def save(self, stage, key, df, **meta):
+        os.makedirs(self.root, exist_ok=True)
+        df.to_parquet(self.path(stage, key), index=False)
+
+        # drop the artifact this one replaces so the cache does not grow on every run
+        previous = self.manifest.get(stage)
+        if previous and previous['key'] != key:
+            old_path = self.path(stage, previous['key'])
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+        self.manifest[stage] = {'key': key, **meta}
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def previous(self, stage):
+        return self.manifest.get(stage)
+
+    def load_latest(self, stage, version=None):
+        # the last artifact written for stage, or None if there is none or it was built by another version
+        previous = self.previous(stage)
+        if not previous or (version is not None and previous.get('version') != version):
+            return None
+        return self.load(stage, previous['key'])
+
+
+def read_appended(cache, stage, path, reader, header=False, version=1, params=None):
+    """
+    Reads a source file through the cache. If the file only had bytes appended since the last run, just the
+    new tail is parsed and concatenated onto the cached frame. With header=True the file's first line is
+    prepended to the tail so the reader sees the same columns as for the full file. params are passed to the
+    reader as keyword arguments. Both version and params are part of the key, and a cached frame written under
+    another version or other params is never extended.
+
+    Returns (key, df, delta, parent, mode): delta holds only the newly parsed rows and parent the key of the
+    artifact that was extended, both None when the whole file was (re)read or reused unchanged. mode is one of
+    'cached', 'incremental' or 'full'.
+    """
+    params = params or {}
+    fp = fingerprint(path)
+    key = make_key(stage, version, params, fp)
+
+    cached = cache.load(stage, key)
+    if cached is not None:
+        return key, cached, None, None, 'cached'
+
+    previous = cache.previous(stage)
+    if previous and previous.get('version') == version and previous.get('params') == make_key(params) \
+            and previous.get('path') == fp['path'] and 0 < previous['size'] < fp['size']:
+        prefix, digest = _digests(path, previous['size'])
+        prior = cache.load(stage, previous['key']) if prefix == previous['digest'] else None
+        if prior is not None:
+            with open(path, 'rb') as f:
+                first_line = f.readline() if header else b''
+                f.seek(previous['size'])
+                tail = f.read()
+            delta = reader(io.BytesIO(first_line + tail), **params)
+            df = concat_frames([prior, delta])
+            cache.save(stage, key, df, version=version, params=make_key(params), path=fp['path'], size=fp['size'], digest=digest)
+            return key, df, delta, previous['key'], 'incremental'
+
+    df = reader(path, **params)
+    _, digest = _digests(path)
+    cache.save(stage, key, df, version=version, params=make_key(params), path=fp['path'], size=fp['size'], digest=digest)
+    return key, df, None, None, 'full'
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+
+RETURN_LAGS = [1, 2, 5]
+VOLATILITY_WINDOWS = [5, 20]
+MOVING_AVERAGE_WINDOWS = [5, 20]
+VOLUME_WINDOW = 20
+SENTIMENT_WINDOW = 5
+SENTIMENT_HALFLIFE = 3
+
+TECHNICAL_COLUMNS = (
+    [f'return_lag_{lag}' for lag in RETURN_LAGS]
+    + [f'volatility_{window}' for window in VOLATILITY_WINDOWS]
+    + [f'open_ma_ratio_{window}' for window in MOVING_AVERAGE_WINDOWS]
+    + [f'volume_z_{VOLUME_WINDOW}']
+    + ['relevant_positive', 'relevant_negative']
+    + [f'positive_sentiment_ma_{SENTIMENT_WINDOW}', f'negative_sentiment_ma_{SENTIMENT_WINDOW}']
+    + ['relevant_positive_ewm', 'relevant_negative_ewm']
+)
+
+
+def _group_starts(codes):
+    # for every row of a frame sorted by group, the position of the first row of its group
+    positions = np.arange(len(codes))
+    new_group = np.r_[True, codes[1:] != codes[:-1]] if len(codes) else np.array([], dtype=bool)
+    return np.maximum.accumulate(np.where(new_group, positions, 0))
+
+
+def _rolling_mean_std(values, starts, window):
+    """
+    Trailing mean and standard deviation over the last `window` rows of each group, from running sums. A row's
+    window never reaches before its group's first row, and is NaN until the group has `window` valid values.
+    """
+    values = values.astype(np.float64)
+    valid = np.isfinite(values)
+    filled = np.where(valid, values, 0.0)
+
+    # shift each group by its first value so the running sums of squares stay well conditioned
+    shift = filled[starts]
+    centered = np.where(valid, filled - shift, 0.0)
+
+    positions = np.arange(len(values))
+    lo = np.maximum(positions - window + 1, starts)
+    count = np.r_[0, np.cumsum(valid)]
+    total = np.r_[0.0, np.cumsum(centered)]
+    squares = np.r_[0.0, np.cumsum(centered * centered)]
+
+    n = count[positions + 1] - count[lo]
+    s = total[positions + 1] - total[lo]
+    ss = squares[positions + 1] - squares[lo]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = s / n
+        # a single value has no sample variance, NaN as in pandas rather than rounding noise over zero
+        variance = np.where(n > 1, np.maximum(ss - s * mean, 0.0) / (n - 1), np.nan)
+    full = n >= window
+    return np.where(full, mean + shift, np.nan), np.where(full, np.sqrt(variance), np.nan)
+
+
+def add_technical_features(final_df):
+    """
+    Adds lagged returns, rolling volatility, moving average ratios, volume z-scores and rolling / exponentially
+    decayed sentiment per Symbol. Every window ends at the row's own date, so a row only uses its own day and
+    earlier days of the same symbol.
+    """
+    df = final_df.sort_values(['Symbol', 'Date'], kind='stable').reset_index(drop=True)
+    codes = df['Symbol'].cat.codes.to_numpy() if isinstance(df['Symbol'].dtype, pd.CategoricalDtype) \
+        else pd.factorize(df['Symbol'])[0]
+    starts = _group_starts(codes)
+    by_symbol = df.groupby('Symbol', observed=True, sort=False)
+
+    features = {}
+    for lag in RETURN_LAGS:
+        features[f'return_lag_{lag}'] = by_symbol['Percentchange'].shift(lag).to_numpy()
+
+    percent_change = df['Percentchange'].to_numpy()
+    for window in VOLATILITY_WINDOWS:
+        features[f'volatility_{window}'] = _rolling_mean_std(percent_change, starts, window)[1]
+
+    open_price = df['Open'].to_numpy()
+    for window in MOVING_AVERAGE_WINDOWS:
+        moving_average = _rolling_mean_std(open_price, starts, window)[0]
+        features[f'open_ma_ratio_{window}'] = open_price / moving_average - 1
+
+    volume = df['Volume'].to_numpy()
+    volume_mean, volume_std = _rolling_mean_std(volume, starts, VOLUME_WINDOW)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # a flat volume window has no spread, score it 0 rather than inf
+        features[f'volume_z_{VOLUME_WINDOW}'] = np.where(volume_std == 0, 0.0, (volume - volume_mean) / volume_std)
+
+    # the day's sentiment weighted by how relevant that day's headlines are to the company
+    features['relevant_positive'] = (df['positive_sentiment'] * df['positive_relevance']).to_numpy()
+    features['relevant_negative'] = (df['negative_sentiment'] * df['negative_relevance']).to_numpy()
+
+    for column in ['positive_sentiment', 'negative_sentiment']:
+        features[f'{column}_ma_{SENTIMENT_WINDOW}'] = _rolling_mean_std(df[column].to_numpy(), starts, SENTIMENT_WINDOW)[0]
+
+    relevant = pd.DataFrame({'relevant_positive': features['relevant_positive'],
+                             'relevant_negative': features['relevant_negative']})
+    decayed = relevant.groupby(codes, sort=False).ewm(halflife=SENTIMENT_HALFLIFE).mean().reset_index(level=0, drop=True)
+    features['relevant_positive_ewm'] = decayed['relevant_positive'].sort_index().to_numpy()
+    features['relevant_negative_ewm'] = decayed['relevant_negative'].sort_index().to_numpy()
+
+    return df.assign(**{column: features[column].astype(np.float32) for column in TECHNICAL_COLUMNS})
@@ -0,0 +1,98 @@
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _current_rss():
+    # resident set size in bytes, from /proc on Linux, otherwise the process-lifetime peak
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return _peak_rss()
+
+
+def _peak_rss():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _children_peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _RssSampler:
+    """
+    Polls the process RSS on a background thread while a stage runs, keeping the highest value seen.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = _current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss())
+
+
+class StageProfiler:
+    """
+    Records wall time, peak RSS and output row count for every pipeline stage, and renders them as a report.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        record = {'stage': name, 'rows': None, 'mode': None}
+        start_rss = _current_rss()
+        start = time.perf_counter()
+        with _RssSampler() as sampler:
+            yield record
+        record['seconds'] = round(time.perf_counter() - start, 4)
+        record['start_rss_mb'] = round(start_rss / 2 ** 20, 1)
+        record['peak_rss_mb'] = round(sampler.peak / 2 ** 20, 1)
+        self.stages.append(record)
+
+    def report(self):
+        return {
+            'stages': self.stages,
+            'total_seconds': round(time.perf_counter() - self.started, 4),
+            'peak_rss_mb': round(_peak_rss() / 2 ** 20, 1),
+            # worker processes (the VADER pool) are not in the stage RSS, only in this lifetime peak
+            'children_peak_rss_mb': round(_children_peak_rss() / 2 ** 20, 1),
+        }
+
+    def to_json(self, path=None):
+        payload = json.dumps(self.report(), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(payload)
+        return payload
+
+    def table(self):
+        lines = [f'{"stage":<16}{"rows":>12}{"seconds":>10}{"peak MB":>10}  mode']
+        for record in self.stages:
+            rows = '' if record['rows'] is None else f'{record["rows"]:,}'
+            lines.append(f'{record["stage"]:<16}{rows:>12}{record["seconds"]:>10.3f}{record["peak_rss_mb"]:>10.1f}'
+                         f'  {record["mode"] or ""}')
+        return '\n'.join(lines)
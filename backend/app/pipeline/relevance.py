@@ -0,0 +1,94 @@
+import string
+
+import numpy as np
+import pandas as pd
+
+
+RELEVANT_COLUMNS = ['Symbol', 'Shortname', 'Longname', 'Sector', 'Industry']
+PUNCTUATION = string.punctuation + '\u2018\u2019\u201c\u201d\u2026'
+
+
+# whitespace words with only their leading/trailing punctuation stripped, so "don't" and "at&t" stay one token
+#   and a bare "&" or "-" is kept as a word, as in the original .split()
+def tokenize(text):
+    return [word.strip(PUNCTUATION) or word for word in str(text).lower().split()]
+
+
+class TermIndex:
+    """
+    Vocabulary of every company's relevant terms (Symbol, Shortname, Longname, Sector, Industry). Each term is
+    tokenized like the headlines, so multi-word names such as "Apple Inc." are matched as consecutive tokens.
+    """
+
+    def __init__(self, companies):
+        self.phrases = {}
+        self.lengths = {}
+
+        term_ids = np.full((len(companies), len(RELEVANT_COLUMNS)), -1, dtype=np.int64)
+        for j, column in enumerate(RELEVANT_COLUMNS):
+            for i, value in enumerate(companies[column].to_numpy()):
+                if pd.isna(value):
+                    continue
+                phrase = tuple(tokenize(value))
+                if not phrase:
+                    continue
+                term_ids[i, j] = self.phrases.setdefault(phrase, len(self.phrases))
+                self.lengths.setdefault(phrase[0], set()).add(len(phrase))
+
+        self.term_ids = term_ids
+        self.lengths = {token: sorted(lengths) for token, lengths in self.lengths.items()}
+
+    def match(self, texts):
+        """
+        Returns (present, word_counts): a texts x terms boolean matrix of which terms occur in each text,
+        and the number of tokens in each text.
+        """
+        present = np.zeros((len(texts), max(len(self.phrases), 1)), dtype=bool)
+        word_counts = np.zeros(len(texts), dtype=np.int64)
+
+        for row, text in enumerate(texts):
+            tokens = tokenize(text) if isinstance(text, str) else []
+            word_counts[row] = len(tokens)
+            for i, token in enumerate(tokens):
+                lengths = self.lengths.get(token)
+                if lengths is None:
+                    continue
+                for n in lengths:
+                    term = self.phrases.get(tuple(tokens[i:i + n]))
+                    if term is not None:
+                        present[row, term] = True
+
+        return present, word_counts
+
+
+def _scores(present, word_counts, day_idx, term_ids):
+    # count, per row, how many of its company's terms appear in that day's headlines
+    hits = present[day_idx[:, None], np.maximum(term_ids, 0)] & (term_ids >= 0)
+    counts = hits.sum(axis=1)
+
+    # Normalize by the number of words in the day's headlines, avoiding division by zero
+    words = word_counts[day_idx]
+    scores = np.divide(counts, words, out=np.zeros(len(counts), dtype=np.float64), where=words > 0)
+    return np.clip(scores, 0, 1)
+
+
+def relevance_scores(final_df):
+    """
+    Computes positive_relevance / negative_relevance for every (Symbol, Date) row of final_df. Each day's
+    headlines are tokenized once, and all companies are matched against them through a shared term index.
+    """
+    day_codes, days = pd.factorize(final_df['Date'])
+    day_rows = pd.Series(np.arange(len(final_df))).groupby(day_codes).first().to_numpy()
+
+    companies = final_df.drop_duplicates('Symbol')[RELEVANT_COLUMNS]
+    company_codes = pd.Index(companies['Symbol']).get_indexer(final_df['Symbol'])
+    index = TermIndex(companies)
+    term_ids = index.term_ids[company_codes]
+
+    positive_present, positive_words = index.match(final_df['positive_headline'].iloc[day_rows].to_numpy())
+    negative_present, negative_words = index.match(final_df['negative_headline'].iloc[day_rows].to_numpy())
+
+    return (
+        _scores(positive_present, positive_words, day_codes, term_ids),
+        _scores(negative_present, negative_words, day_codes, term_ids),
+    )
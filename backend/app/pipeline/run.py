@@ -0,0 +1,159 @@
+from collections import namedtuple
+from functools import partial
+import os
+
+import pandas as pd
+
+from . import stages
+from .cache import StageCache, concat_frames, fingerprint, make_key, read_appended
+from .features import add_technical_features
+from .profile import StageProfiler
+from .sentiment import SentimentScorer
+
+
+# key: hash of the stage's inputs, df: the stage output, delta: output rows that were (re)computed this run
+# when the stage was extended incrementally, parent: key of the cached artifact that was extended,
+# mode: how the output was produced ('cached', 'incremental' or 'full')
+StageResult = namedtuple('StageResult', ['key', 'df', 'delta', 'parent', 'mode'])
+
+# the stage whose artifact holds the finished feature frame
+FINAL_STAGE = 'features'
+
+# part of every stage's key: bump a stage's version whenever a change to the code that builds it changes its
+#   output, so artifacts written by the old code are rebuilt instead of reused or extended
+STAGE_VERSIONS = {
+    'load_stocks': 2,
+    'load_companies': 1,
+    'load_index': 2,
+    'load_news': 1,
+    'clean_stocks': 1,
+    'sentiment': 1,
+    'daily': 1,
+    'join': 1,
+    'relevance': 1,
+    FINAL_STAGE: 1,
+}
+
+
+def _date_column(df):
+    return 'Date' if 'Date' in df.columns else 'date'
+
+
+def _on_dates(df, dates):
+    return df[df[_date_column(df)].isin(dates)]
+
+
+class FeaturePipeline:
+    """
+    Builds final_df in stages (load -> clean -> sentiment -> daily aggregation -> join -> relevance), caching
+    every stage on disk. A stage is only recomputed when one of its inputs or parameters changed, and when
+    its inputs merely grew (new stock days or news lines appended to the source files) only the affected
+    dates are recomputed and spliced into the previous artifact. Every stage's wall time, peak RSS and row
+    count are recorded in self.profiler.
+    """
+
+    def __init__(self, data_dir='data', news_path='News_Category_Dataset_v3.json', cache_dir='cache',
+                 start='2012-01-01', end='2022-01-01'):
+        self.data_dir = data_dir
+        self.news_path = news_path
+        self.cache = StageCache(cache_dir)
+        self.scorer = SentimentScorer(cache_path=os.path.join(cache_dir, 'headline_scores.parquet'))
+        self.start = start
+        self.end = end
+        self.profiler = StageProfiler()
+
+    def _profiled(self, name, build):
+        with self.profiler.stage(name) as record:
+            result = build()
+            record['rows'] = len(result.df)
+            record['mode'] = result.mode
+        return result
+
+    def _source(self, name, path, reader, header=False, params=None):
+        return self._profiled(name, lambda: StageResult(*read_appended(self.cache, name, path, reader, header=header,
+                                                                       version=STAGE_VERSIONS[name], params=params)))
+
+    def _static(self, name, path, reader):
+        return self._profiled(name, lambda: self._build_static(name, path, reader))
+
+    def _stage(self, name, func, inputs, params=None, incremental=True):
+        return self._profiled(name, lambda: self._build_stage(name, func, inputs, params, incremental))
+
+    def _build_static(self, name, path, reader):
+        version = STAGE_VERSIONS[name]
+        key = make_key(name, version, fingerprint(path))
+        df = self.cache.load(name, key)
+        if df is not None:
+            return StageResult(key, df, None, None, 'cached')
+        df = reader(path)
+        self.cache.save(name, key, df, version=version)
+        return StageResult(key, df, None, None, 'full')
+
+    def _build_stage(self, name, func, inputs, params, incremental):
+        params = params or {}
+        version = STAGE_VERSIONS[name]
+        input_keys = [result.key for result in inputs]
+        key = make_key(name, version, params, input_keys)
+
+        df = self.cache.load(name, key)
+        if df is not None:
+            return StageResult(key, df, None, None, 'cached')
+
+        previous = self.cache.previous(name)
+        prior = None
+        if incremental and previous and previous.get('version') == version \
+                and previous.get('params') == make_key(params):
+            # every input must either be unchanged or be a direct extension of what the last run used
+            extended = [result.parent == prev_key and result.delta is not None
+                        for result, prev_key in zip(inputs, previous['inputs'])]
+            unchanged = [result.key == prev_key for result, prev_key in zip(inputs, previous['inputs'])]
+            if any(extended) and all(e or u for e, u in zip(extended, unchanged)):
+                prior = self.cache.load(name, previous['key'])
+
+        if prior is None:
+            df = func(*[result.df for result in inputs], **params)
+            self.cache.save(name, key, df, version=version, params=make_key(params), inputs=input_keys)
+            return StageResult(key, df, None, None, 'full')
+
+        # recompute only the dates that received new rows, unchanged inputs are passed through whole
+        touched = pd.Index(pd.concat([result.delta[_date_column(result.delta)]
+                                      for result in inputs if result.delta is not None]).unique())
+        delta = func(*[_on_dates(result.df, touched) if result.delta is not None else result.df
+                       for result in inputs], **params)
+        kept = prior[~prior[_date_column(prior)].isin(touched)]
+        df = concat_frames([kept, delta])
+        self.cache.save(name, key, df, version=version, params=make_key(params), inputs=input_keys)
+        return StageResult(key, df, delta, previous['key'], 'incremental')
+
+    def run(self):
+        # load, stocks and index only within the overlapping years
+        window = {'start': self.start, 'end': self.end}
+        sp500_stocks = self._source('load_stocks', f'{self.data_dir}/sp500_stocks.csv', stages.read_stocks,
+                                    header=True, params=window)
+        sp500_companies = self._static('load_companies', f'{self.data_dir}/sp500_companies.csv', stages.read_companies)
+        sp500_index = self._source('load_index', f'{self.data_dir}/sp500_index.csv', stages.read_index, header=True,
+                                   params=window)
+        news = self._source('load_news', self.news_path, stages.read_news)
+
+        # clean
+        stock_df = self._stage('clean_stocks', stages.clean_stocks, [sp500_stocks, sp500_companies, sp500_index])
+
+        # sentiment
+        news = self._stage('sentiment', partial(stages.score_sentiment, scorer=self.scorer), [news])
+
+        # daily aggregation
+        daily = self._stage('daily', stages.aggregate_daily, [news])
+
+        # join
+        final = self._stage('join', stages.join, [stock_df, daily])
+
+        # relevance
+        final = self._stage('relevance', stages.relevance, [final])
+
+        # technical features, rolling windows need each symbol's full history so this stage is always rebuilt
+        final = self._stage(FINAL_STAGE, add_technical_features, [final], incremental=False)
+        return final.df
+
+
+def build_features(**kwargs):
+    return FeaturePipeline(**kwargs).run()
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+
+_analyzer = None
+
+
+def _init_worker():
+    global _analyzer
+    _analyzer = SentimentIntensityAnalyzer()
+
+
+def _score_chunk(headlines):
+    if _analyzer is None:
+        _init_worker()
+    return [_analyzer.polarity_scores(h)['compound'] for h in headlines]
+
+
+def hash_headlines(headlines):
+    return pd.util.hash_pandas_object(headlines, index=False).to_numpy()
+
+
+class SentimentScorer:
+    """
+    Scores headlines with VADER's compound score. Headlines are deduplicated, looked up in a persistent
+    hash -> score cache, and only the misses are scored, in chunks spread over a process pool.
+    """
+
+    def __init__(self, cache_path='cache/headline_scores.parquet', workers=None, chunk_size=5000):
+        self.cache_path = cache_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+        if cache_path and os.path.exists(cache_path):
+            cached = pd.read_parquet(cache_path)
+            self.scores = pd.Series(cached['score'].to_numpy(), index=cached['hash'].to_numpy())
+        else:
+            self.scores = pd.Series(dtype=np.float64, index=pd.Index([], dtype=np.uint64))
+
+    def _score(self, headlines):
+        chunks = [headlines[i:i + self.chunk_size] for i in range(0, len(headlines), self.chunk_size)]
+        if self.workers == 1 or len(chunks) == 1:
+            return np.array([s for chunk in chunks for s in _score_chunk(chunk)], dtype=np.float64)
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)), initializer=_init_worker) as pool:
+            return np.array([s for scores in pool.map(_score_chunk, chunks) for s in scores], dtype=np.float64)
+
+    def save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp_path = self.cache_path + '.tmp'
+        pd.DataFrame({'hash': self.scores.index.to_numpy(), 'score': self.scores.to_numpy()}).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def compound(self, headlines):
+        headlines = pd.Series(headlines, dtype=str).fillna('')
+        hashes = hash_headlines(headlines)
+
+        unique_hashes, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        missing = ~pd.Index(unique_hashes).isin(self.scores.index)
+        if missing.any():
+            new_scores = self._score(headlines.iloc[first[missing]].tolist())
+            self.scores = pd.concat([self.scores, pd.Series(new_scores, index=unique_hashes[missing])])
+            self.save()
+
+        return self.scores.reindex(unique_hashes).to_numpy()[inverse]
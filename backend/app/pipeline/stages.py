@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from .cache import concat_frames
+from .relevance import relevance_scores
+from .sentiment import SentimentScorer
+
+
+# only the columns the pipeline uses are read, with compact dtypes
+STOCK_DTYPES = {'Symbol': 'category', 'Open': 'float32', 'Close': 'float32', 'Volume': 'float32'}
+COMPANY_DTYPES = {'Symbol': 'category', 'Shortname': 'category', 'Longname': 'category', 'Sector': 'category',
+                  'Industry': 'category'}
+INDEX_DTYPES = {'S&P500': 'float32'}
+NEWS_COLUMNS = ['headline', 'date']
+
+CHUNK_SIZE = 250_000
+
+
+# LOAD
+
+def _in_window(df, start=None, end=None):
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= (df['Date'] >= start).to_numpy()
+    if end is not None:
+        mask &= (df['Date'] < end).to_numpy()
+    df = df[mask]
+    return df.assign(**{column: df[column].cat.remove_unused_categories()
+                        for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)})
+
+
+# each chunk is cut to the [start, end) date window before it is kept, so peak memory is one raw chunk plus the
+#   rows inside the window, and rows outside it are never cached
+def _read_csv_chunked(source, dtypes, parse_dates=None, start=None, end=None):
+    columns = (parse_dates or []) + list(dtypes)
+    chunks = pd.read_csv(source, usecols=columns, dtype=dtypes, parse_dates=parse_dates, chunksize=CHUNK_SIZE)
+    if start is not None or end is not None:
+        chunks = [_in_window(chunk, start, end) for chunk in chunks]
+    return concat_frames(chunks)[columns]
+
+
+def read_stocks(source, start=None, end=None):
+    return _read_csv_chunked(source, STOCK_DTYPES, parse_dates=['Date'], start=start, end=end)
+
+
+def read_companies(source):
+    return _read_csv_chunked(source, COMPANY_DTYPES)
+
+
+def read_index(source, start=None, end=None):
+    return _read_csv_chunked(source, INDEX_DTYPES, parse_dates=['Date'], start=start, end=end)
+
+
+def read_news(source):
+    chunks = pd.read_json(source, lines=True, chunksize=CHUNK_SIZE)
+    news_df = pd.concat([chunk[NEWS_COLUMNS] for chunk in chunks], ignore_index=True)
+    news_df['date'] = pd.to_datetime(news_df['date'])
+    return news_df
+
+
+# CLEAN
+
+# stocks and index are already limited to the overlapping years (2012-2022) when they are read
+def clean_stocks(sp500_stocks, sp500_companies, sp500_index):
+    # companies and index have one row per Symbol / Date, so join on their index instead of a full merge
+    stock_df = sp500_stocks.join(sp500_companies.set_index('Symbol'), on='Symbol', how='inner')
+    stock_df = stock_df.join(sp500_index.set_index('Date'), on='Date', how='inner')
+
+    # Add percent change column to stock dataframe
+    stock_df = stock_df.assign(Percentchange=((stock_df['Close'] - stock_df['Open']) / stock_df['Open']) * 100)
+
+    return stock_df.drop(columns=['Close']).reset_index(drop=True)
+
+
+# SENTIMENT
+
+def score_sentiment(news_df, scorer=None):
+    news_df = news_df.copy()
+
+    scorer = scorer or SentimentScorer(cache_path=None)
+    scores = scorer.compound(news_df['headline'])
+    news_df['sentiment_score'] = scores
+
+    # seperate positive and negative sentiment scores
+    news_df['positive_sentiment'] = np.clip(scores, 0, None)
+    news_df['negative_sentiment'] = np.clip(scores, None, 0)
+
+    return news_df
+
+
+# DAILY AGGREGATION
+
+# joins the headlines of each date with spaces, in their original order: one stable sort, then one
+#   ' '.join per contiguous date slice
+def _join_headlines_by_date(news_df):
+    dates = news_df['date'].to_numpy()
+    order = np.argsort(dates, kind='stable')
+    dates = dates[order]
+    headlines = news_df['headline'].to_numpy(dtype=object)[order]
+
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]]) if len(dates) else np.array([], dtype=int)
+    ends = np.r_[starts[1:], len(dates)]
+    return pd.Series([' '.join(headlines[a:b]) for a, b in zip(starts, ends)], index=dates[starts], dtype=object)
+
+
+# group by date, include a total positive and negative sentiment score, and a total positive and negative headline to check
+#   relevance of specific stock
+def aggregate_daily(news_df):
+    daily = news_df.groupby('date').agg(
+        positive_sentiment = ('positive_sentiment', 'sum'),
+        negative_sentiment = ('negative_sentiment', 'sum'),
+        )
+
+    # split by sign once, then a single grouped join per side keeps each headline with its own score
+    positive = _join_headlines_by_date(news_df.loc[news_df['sentiment_score'] > 0])
+    negative = _join_headlines_by_date(news_df.loc[news_df['sentiment_score'] < 0])
+    daily['positive_headline'] = positive.reindex(daily.index, fill_value='')
+    daily['negative_headline'] = negative.reindex(daily.index, fill_value='')
+
+    return daily.reset_index()
+
+
+# JOIN
+
+def join(stock_df, daily_df):
+    # each day's headline text is shared by every stock row of that day, so store it once per day as a category
+    daily_df = daily_df.astype({'positive_headline': 'category', 'negative_headline': 'category'})
+    final_df = pd.merge(stock_df, daily_df, left_on='Date', right_on='date', how='inner')
+    return final_df.drop(columns=['date'])
+
+
+# RELEVANCE
+
+def relevance(final_df):
+    final_df = final_df.copy()
+    final_df['positive_relevance'], final_df['negative_relevance'] = relevance_scores(final_df)
+    return final_df
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import stages
+
+
+# a 1x dataset: the real one is roughly 100x (500 symbols, ~200k headlines over ten years)
+BASE_SYMBOLS = 5
+BASE_HEADLINES = 2_000
+START = '2012-01-01'
+END = '2022-01-01'
+
+WORDS = ['stocks', 'soar', 'crash', 'great', 'terrible', 'apple', 'energy', 'banks', 'love', 'hate', 'market', 'record']
+SECTORS = ['Technology', 'Energy', 'Financial Services', 'Healthcare', 'Industrials']
+INDUSTRIES = ['Software', 'Oil & Gas', 'Banks', 'Biotechnology', 'Aerospace & Defense']
+
+
+def synthetic_news(rows, days=3650, seed=0):
+    # a scored news frame, shaped like the sentiment stage's output
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(START, periods=days, freq='D')
+    words = np.array(WORDS)
+    headlines = [' '.join(ws) for ws in words[rng.integers(len(words), size=(rows, 6))]]
+    scores = np.round(rng.uniform(-1, 1, rows), 4)
+    scores[rng.random(rows) < 0.1] = 0
+    return pd.DataFrame({
+        'date': dates[rng.integers(days, size=rows)],
+        'headline': headlines,
+        'sentiment_score': scores,
+        'positive_sentiment': np.clip(scores, 0, None),
+        'negative_sentiment': np.clip(scores, None, 0),
+    })
+
+
+def synthetic_companies(symbols, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f'Company{i}' for i in range(symbols)]
+    return pd.DataFrame({
+        'Symbol': [f'S{i}' for i in range(symbols)],
+        'Shortname': [f'{name} Inc.' for name in names],
+        'Longname': [f'{name} Incorporated' for name in names],
+        'Sector': rng.choice(SECTORS, symbols),
+        'Industry': rng.choice(INDUSTRIES, symbols),
+    })
+
+
+def synthetic_final(symbols=500, days=2500, headlines_per_day=40, seed=0):
+    # a joined frame, shaped like the join stage's output
+    news_df = synthetic_news(days * headlines_per_day, days=days, seed=seed)
+    daily_df = stages.aggregate_daily(news_df)
+    final_df = synthetic_companies(symbols, seed).merge(daily_df, how='cross')
+    return final_df.rename(columns={'date': 'Date'})
+
+
+def write_dataset(root, scale=1, seed=0):
+    """
+    Writes sp500_stocks.csv, sp500_companies.csv, sp500_index.csv (under root/data) and
+    News_Category_Dataset_v3.json (under root) with the real files' columns, at `scale` times the 1x size.
+    Returns the paths as keyword arguments for FeaturePipeline.
+    """
+    rng = np.random.default_rng(seed)
+    data_dir = os.path.join(root, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+
+    symbols = BASE_SYMBOLS * scale
+    companies = synthetic_companies(symbols, seed)
+    companies = companies.assign(
+        Exchange='NYQ', Currentprice=100.0, Marketcap=1e10, Ebitda=1e9, Revenuegrowth=0.05, City='New York',
+        State='NY', Country='United States', Fulltimeemployees=1000,
+        Longbusinesssummary='A long business summary that the pipeline never reads. ' * 20, Weight=1 / symbols,
+    )
+    companies.to_csv(os.path.join(data_dir, 'sp500_companies.csv'), index=False)
+
+    dates = pd.bdate_range(START, END, inclusive='left')
+    pd.DataFrame({
+        'Date': dates.strftime('%Y-%m-%d'),
+        'S&P500': np.cumsum(rng.normal(0, 10, len(dates))) + 2000,
+    }).to_csv(os.path.join(data_dir, 'sp500_index.csv'), index=False)
+
+    # a random walk of daily prices per symbol
+    rows = len(dates) * symbols
+    open_price = np.exp(np.cumsum(rng.normal(0, 0.01, (symbols, len(dates))), axis=1) + 4).ravel()
+    close = open_price * (1 + rng.normal(0, 0.01, rows))
+    pd.DataFrame({
+        'Date': np.tile(dates.strftime('%Y-%m-%d'), symbols),
+        'Symbol': np.repeat(companies['Symbol'].to_numpy(), len(dates)),
+        'Adj Close': close,
+        'Close': close,
+        'High': np.maximum(open_price, close) * 1.005,
+        'Low': np.minimum(open_price, close) * 0.995,
+        'Open': open_price,
+        'Volume': rng.integers(100_000, 10_000_000, rows).astype(float),
+    }).to_csv(os.path.join(data_dir, 'sp500_stocks.csv'), index=False, float_format='%.4f')
+
+    news_path = os.path.join(root, 'News_Category_Dataset_v3.json')
+    write_news(news_path, companies, BASE_HEADLINES * scale, dates, rng)
+
+    return {'data_dir': data_dir, 'news_path': news_path}
+
+
+def write_news(path, companies, rows, dates, rng, mode='w'):
+    # news lines in the real file's format, about one in five mentioning a company by name
+    words = np.array(WORDS + ['good', 'bad', 'wins', 'loses', 'strong', 'weak'])
+    headlines = [' '.join(ws) for ws in words[rng.integers(len(words), size=(rows, 7))]]
+    names = companies['Shortname'].to_numpy()
+    mentions = rng.random(rows) < 0.2
+    for i in np.flatnonzero(mentions):
+        headlines[i] = f'{names[rng.integers(len(names))]} {headlines[i]}'
+
+    pd.DataFrame({
+        'link': 'https://example.com/news',
+        'headline': headlines,
+        'category': 'BUSINESS',
+        'short_description': 'A short description the pipeline never reads.',
+        'authors': 'Staff',
+        'date': dates[rng.integers(len(dates), size=rows)].strftime('%Y-%m-%d'),
+    }).to_json(path, orient='records', lines=True, mode=mode)
+
+
+def append_news(paths, rows, seed=1):
+    # appends news lines to a dataset written by write_dataset, as a daily news feed would
+    companies = pd.read_csv(os.path.join(paths['data_dir'], 'sp500_companies.csv'))
+    dates = pd.bdate_range(START, END, inclusive='left')
+    write_news(paths['news_path'], companies, rows, dates, np.random.default_rng(seed), mode='a')
@@ -0,0 +1,19 @@
+import pytest
+
+from app.pipeline.run import FeaturePipeline
+from app.pipeline.synthetic import write_dataset
+
+
+# a 1x synthetic dataset and its feature frame, built once per session; tests must not modify its files,
+#   tests that append to the sources copy them first
+@pytest.fixture(scope='session')
+def dataset(tmp_path_factory):
+    root = tmp_path_factory.mktemp('dataset')
+    paths = write_dataset(str(root))
+    cache_dir = str(root / 'cache')
+    final_df = FeaturePipeline(cache_dir=cache_dir, **paths).run()
+    return {'paths': paths, 'cache_dir': cache_dir, 'final_df': final_df}
+
+
+def by_symbol_date(df):
+    return df.sort_values(['Symbol', 'Date'], kind='stable').reset_index(drop=True)
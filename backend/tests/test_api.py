@@ -0,0 +1,210 @@
+import json
+import time
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.cache import ResponseCache
+from app.api.store import FeatureStore
+from app.main import app
+from app.model.registry import ModelSet
+from app.model.train import train_models
+
+
+@pytest.fixture(scope='module')
+def models_dir(dataset, tmp_path_factory):
+    path = tmp_path_factory.mktemp('models')
+    train_models(dataset['final_df'], workers=1).save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def client(dataset, models_dir, monkeypatch):
+    # the lifespan loads the feature store from the session dataset's cache and the trained global model
+    monkeypatch.setenv('FEATURES_CACHE_DIR', dataset['cache_dir'])
+    monkeypatch.setenv('MODELS_DIR', models_dir)
+    with TestClient(app) as client:
+        yield client
+
+
+def _replace_store(client, store):
+    client.app.state.features = store
+    client.app.state.responses.clear()
+
+
+def test_features_in_date_range(client, dataset):
+    response = client.get('/stocks/s0/features', params={'start': '2015-01-01', 'end': '2015-01-31'})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload['symbol'] == 'S0'
+    assert payload['Shortname'] == 'Company0 Inc.'
+
+    dates = [record['date'] for record in payload['features']]
+    final_df = dataset['final_df']
+    expected = final_df[(final_df['Symbol'] == 'S0') & final_df['Date'].between('2015-01-01', '2015-01-31')]
+    assert dates == sorted(expected['Date'].dt.strftime('%Y-%m-%d'))
+    assert {'Open', 'Percentchange', 'positive_relevance', 'volatility_20'} <= set(payload['features'][0])
+
+
+def test_unknown_symbol_is_404(client):
+    assert client.get('/stocks/NOPE/features').status_code == 404
+    assert client.get('/stocks/NOPE/predict').status_code == 404
+
+
+def test_predict_serves_the_trained_model(client, dataset):
+    response = client.get('/stocks/S1/predict')
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload['model'] == 'ridge-global'
+    assert payload['as_of'] == str(dataset['final_df']['Date'].max().date())
+
+    store = client.app.state.features
+    features = store.get('S1')
+    model_set = store.model_sets[0]
+    latest = features.values[-1, [features.columns.index(column) for column in model_set.features]]
+    assert payload['predicted_percentchange'] == pytest.approx(model_set.models['__all__'].predict(latest[None, :])[0])
+
+
+def test_predict_without_a_covering_model_is_404(client, dataset):
+    # per-symbol models for every symbol but S1
+    model_set = train_models(dataset['final_df'], group_by='Symbol', workers=1)
+    models = {symbol: model for symbol, model in model_set.models.items() if symbol != 'S1'}
+    _replace_store(client, FeatureStore(dataset['final_df'], [ModelSet('Symbol', model_set.features, models)]))
+
+    assert client.get('/stocks/S0/predict').json()['model'] == 'ridge-symbol'
+    assert client.get('/stocks/S1/predict').status_code == 404
+
+
+def test_predict_without_models_is_503(client, dataset):
+    _replace_store(client, FeatureStore(dataset['final_df']))
+    assert client.get('/stocks/S0/predict').status_code == 503
+    assert client.get('/stocks/S0/features').status_code == 200
+
+
+def test_unloaded_store_is_503(dataset, tmp_path, monkeypatch):
+    monkeypatch.setenv('FEATURES_CACHE_DIR', str(tmp_path / 'empty'))
+    with TestClient(app) as client:
+        assert client.get('/stocks/S0/features').status_code == 503
+        assert client.get('/stocks/S0/predict').status_code == 503
+
+
+# RESPONSE CACHE
+
+def test_etag_revalidation_answers_304(client):
+    first = client.get('/stocks/S0/features')
+    tag = first.headers['etag']
+    assert '/stocks/S0/features?' in client.app.state.responses.entries
+
+    for if_none_match in [tag, f'W/{tag}', f'"other", {tag}']:
+        response = client.get('/stocks/S0/features', headers={'If-None-Match': if_none_match})
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response.headers['etag'] == tag
+
+    cached = client.get('/stocks/S0/features', headers={'If-None-Match': '"stale"'})
+    assert cached.status_code == 200
+    assert cached.content == first.content
+
+
+def test_errors_and_ndjson_bypass_the_cache(client):
+    assert client.get('/stocks/NOPE/features').status_code == 404
+    response = client.get('/stocks/batch', params={'symbols': 'S0', 'format': 'ndjson'})
+    assert response.status_code == 200
+    assert 'etag' not in response.headers
+    assert client.app.state.responses.entries == {}
+
+
+def test_large_bodies_are_served_but_not_cached(client, monkeypatch):
+    monkeypatch.setattr(client.app.state.responses, 'max_entry_bytes', 1024)
+    response = client.get('/stocks/S0/features')
+    assert response.status_code == 200
+    assert len(response.content) > 1024
+    assert client.app.state.responses.entries == {}
+
+
+def test_cached_responses_keep_cors_headers(client):
+    origin = {'Origin': 'http://localhost:3000'}
+    for _ in range(2):
+        response = client.get('/stocks/S0/features', headers=origin)
+        assert response.headers['access-control-allow-origin'] == 'http://localhost:3000'
+    assert '/stocks/S0/features?' in client.app.state.responses.entries
+
+
+def test_cache_evicts_least_recently_used_by_count_and_size():
+    cache = ResponseCache(max_entries=3, max_bytes=100, max_entry_bytes=40)
+    for key in 'abc':
+        cache.put(key, b'x' * 10, 200, {})
+    cache.get('a')
+    cache.put('d', b'x' * 10, 200, {})
+    assert list(cache.entries) == ['c', 'a', 'd']
+
+    # 3 x 10 + 2 x 35 bytes is over the budget, so the oldest entries go until it fits
+    cache.put('e', b'x' * 35, 200, {})
+    cache.put('f', b'x' * 35, 200, {})
+    assert list(cache.entries) == ['d', 'e', 'f']
+    assert cache.size == 80
+
+    # too large to store at all, but still returned with its ETag
+    entry = cache.put('g', b'x' * 41, 200, {})
+    assert entry['etag'] and 'g' not in cache.entries
+    assert cache.size == 80
+
+    cache.put('d', b'x' * 5, 200, {})
+    assert cache.size == 75
+    cache.clear()
+    assert cache.size == 0 and not cache.entries
+
+
+def test_cache_expires_entries(monkeypatch):
+    cache = ResponseCache(ttl=10)
+    cache.put('a', b'body', 200, {})
+    now = time.monotonic()
+    monkeypatch.setattr('app.api.cache.time.monotonic', lambda: now + 11)
+    assert cache.get('a') is None
+    assert cache.size == 0
+
+
+# BATCH
+
+BATCH = {'symbols': 's0:2015-01-01:2015-03-31, S1, NOPE, S2::2012-06-30', 'start': '2016-01-01', 'end': '2016-12-31'}
+
+
+def _expected_dates(final_df, symbol, start, end):
+    rows = final_df[(final_df['Symbol'] == symbol) & final_df['Date'].between(start, end)]
+    return sorted(rows['Date'].dt.strftime('%Y-%m-%d'))
+
+
+def test_batch_json_slices_each_symbol_to_its_range(client, dataset):
+    payload = client.get('/stocks/batch', params=BATCH).json()
+    final_df = dataset['final_df']
+    assert payload['missing'] == ['NOPE']
+    assert list(payload['symbols']) == ['S0', 'S1', 'S2']
+    assert payload['symbols']['S0']['date'] == _expected_dates(final_df, 'S0', '2015-01-01', '2015-03-31')
+    assert payload['symbols']['S1']['date'] == _expected_dates(final_df, 'S1', '2016-01-01', '2016-12-31')
+    # an empty bound falls back to the request's
+    assert payload['symbols']['S2']['date'] == []
+    assert len(payload['symbols']['S0']['Open']) == len(payload['symbols']['S0']['date'])
+
+
+def test_batch_formats_agree(client):
+    columns = client.get('/stocks/batch', params=BATCH).json()['symbols']
+
+    arrow = pa.ipc.open_stream(client.get('/stocks/batch', params={**BATCH, 'format': 'arrow'}).content)
+    table = arrow.read_pandas()
+    lines = client.get('/stocks/batch', params={**BATCH, 'format': 'ndjson'}).text.splitlines()
+    records = [json.loads(line) for line in lines]
+
+    for symbol, payload in columns.items():
+        arrow_rows = table[table['symbol'] == symbol]
+        assert arrow_rows['date'].astype(str).tolist() == payload['date']
+        assert arrow_rows['Open'].tolist() == payload['Open']
+
+        ndjson_rows = [record for record in records if record['symbol'] == symbol]
+        assert [record['date'] for record in ndjson_rows] == payload['date']
+        assert [record['Open'] for record in ndjson_rows] == payload['Open']
+
+
+@pytest.mark.parametrize('symbols', ['S0:2015-13-01', 'S0:2015-01-01:2015-02-01:x'])
+def test_batch_rejects_malformed_ranges(client, symbols):
+    assert client.get('/stocks/batch', params={'symbols': symbols}).status_code == 400
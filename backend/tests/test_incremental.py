@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from app.pipeline.run import FeaturePipeline
+from app.pipeline.synthetic import append_news
+from conftest import by_symbol_date
+
+
+def _copy_sources(paths, root):
+    # the session dataset is shared, so appends go to a private copy of its source files
+    data_dir = shutil.copytree(paths['data_dir'], root / 'data')
+    news_path = shutil.copy(paths['news_path'], root / os.path.basename(paths['news_path']))
+    return {'data_dir': str(data_dir), 'news_path': str(news_path)}
+
+
+def _hold_back_last_day(path, float_format=None):
+    df = pd.read_csv(path)
+    last = df['Date'] == df['Date'].max()
+    df[~last].to_csv(path, index=False, float_format=float_format)
+    return df[last]
+
+
+def _run(cache_dir, paths):
+    pipeline = FeaturePipeline(cache_dir=str(cache_dir), **paths)
+    final_df = pipeline.run()
+    return final_df, {record['stage']: record['mode'] for record in pipeline.profiler.stages}
+
+
+def test_news_append_matches_cold_rebuild(dataset, tmp_path):
+    paths = _copy_sources(dataset['paths'], tmp_path)
+    _run(tmp_path / 'cache', paths)
+
+    append_news(paths, 50)
+    appended, modes = _run(tmp_path / 'cache', paths)
+    assert modes['load_news'] == 'incremental'
+    assert modes['daily'] == 'incremental'
+    assert modes['load_stocks'] == 'cached'
+
+    cold, _ = _run(tmp_path / 'cold', paths)
+    assert_frame_equal(by_symbol_date(appended), by_symbol_date(cold), check_categorical=False, check_dtype=False)
+
+
+def test_stock_day_append_matches_cold_rebuild(dataset, tmp_path):
+    paths = _copy_sources(dataset['paths'], tmp_path)
+    stocks_path = os.path.join(paths['data_dir'], 'sp500_stocks.csv')
+    index_path = os.path.join(paths['data_dir'], 'sp500_index.csv')
+    stock_day = _hold_back_last_day(stocks_path, '%.4f')
+    index_day = _hold_back_last_day(index_path)
+    _run(tmp_path / 'cache', paths)
+
+    stock_day.to_csv(stocks_path, mode='a', header=False, index=False, float_format='%.4f')
+    index_day.to_csv(index_path, mode='a', header=False, index=False)
+    appended, modes = _run(tmp_path / 'cache', paths)
+    for stage in ['load_stocks', 'load_index', 'clean_stocks', 'join', 'relevance']:
+        assert modes[stage] == 'incremental', stage
+    assert modes['load_news'] == 'cached'
+
+    cold, _ = _run(tmp_path / 'cold', paths)
+    assert len(cold) == len(appended)
+    assert_frame_equal(by_symbol_date(appended), by_symbol_date(cold), check_categorical=False, check_dtype=False)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from app.pipeline.features import TECHNICAL_COLUMNS, _group_starts, _rolling_mean_std, add_technical_features
+from conftest import by_symbol_date
+
+
+@pytest.mark.parametrize('window', [1, 5, 20])
+def test_rolling_mean_std_matches_pandas(window):
+    rng = np.random.default_rng(0)
+    groups = np.repeat(np.arange(4), [3, 50, 30, 120])
+    values = rng.normal(100, 5, len(groups))
+    values[rng.random(len(groups)) < 0.05] = np.nan
+
+    mean, std = _rolling_mean_std(values, _group_starts(groups), window)
+
+    rolling = pd.Series(values).groupby(groups).rolling(window, min_periods=window)
+    np.testing.assert_allclose(mean, rolling.mean().to_numpy(), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(std, rolling.std().to_numpy(), rtol=1e-6, atol=1e-9)
+
+
+def test_features_do_not_use_future_rows(dataset):
+    final_df = dataset['final_df']
+    base = final_df.drop(columns=TECHNICAL_COLUMNS)
+    cutoff = base['Date'].sort_values().iloc[len(base) // 2]
+
+    # scramble every value after the cutoff, the features up to the cutoff must not move
+    future = base['Date'] > cutoff
+    changed = base.copy()
+    for column in ['Open', 'Volume', 'Percentchange', 'positive_sentiment', 'negative_sentiment',
+                   'positive_relevance', 'negative_relevance']:
+        changed.loc[future, column] = changed.loc[future, column] * 3 + 1
+
+    before = by_symbol_date(add_technical_features(base))
+    after = by_symbol_date(add_technical_features(changed))
+    past = before['Date'] <= cutoff
+    assert_frame_equal(before.loc[past, TECHNICAL_COLUMNS], after.loc[past, TECHNICAL_COLUMNS])
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.pipeline.bench import calculate_relevance_legacy
+from app.pipeline.relevance import TermIndex, relevance_scores, tokenize
+
+
+COMPANIES = pd.DataFrame({
+    'Symbol': ['AAPL', 'XOM', 'T'],
+    'Shortname': ['Apple', 'Exxon', 'Verizon'],
+    'Longname': ['Apple', 'ExxonMobil', 'Verizon'],
+    'Sector': ['Technology', 'Energy', 'Communication'],
+    'Industry': ['Electronics', 'Oil', 'Telecom'],
+})
+
+
+def _final(headlines, companies=COMPANIES):
+    # one row per (company, day), every company sharing the day's headlines
+    days = pd.DataFrame({
+        'Date': pd.date_range('2020-01-01', periods=len(headlines)),
+        'positive_headline': [positive for positive, _ in headlines],
+        'negative_headline': [negative for _, negative in headlines],
+    })
+    return companies.merge(days, how='cross')
+
+
+def _scores(headlines, companies=COMPANIES):
+    final_df = _final(headlines, companies)
+    positive, negative = relevance_scores(final_df)
+    return final_df.assign(positive_relevance=positive, negative_relevance=negative)
+
+
+def test_matches_legacy_for_single_word_terms():
+    rng = np.random.default_rng(0)
+    words = np.array(['apple', 'exxon', 'exxonmobil', 'energy', 'oil', 'telecom', 't', 'aapl', 'xom', 'market',
+                      'stocks', 'soar', 'crash', 'record', 'Technology', 'OIL'])
+    headlines = [(' '.join(rng.choice(words, rng.integers(1, 12))), ' '.join(rng.choice(words, rng.integers(0, 12))))
+                 for _ in range(50)]
+    final_df = _scores(headlines)
+
+    # the original clipped the row-wise scores to [0, 1] after the apply
+    legacy = np.clip(final_df.apply(calculate_relevance_legacy, axis=1), 0, 1)
+    np.testing.assert_allclose(final_df['positive_relevance'], legacy[0])
+    np.testing.assert_allclose(final_df['negative_relevance'], legacy[1])
+
+
+def test_multi_word_names_match_as_phrases():
+    companies = COMPANIES.assign(Shortname=['Apple Inc.', 'Exxon Mobil Corporation', 'Verizon'],
+                                 Longname=['Apple Incorporated', 'Exxon Mobil Corporation', 'Verizon'])
+    final_df = _scores([('Apple Inc. beats estimates', 'Inc. Apple misses, Exxon Mobil falls')], companies)
+    relevance = final_df.set_index('Symbol')
+
+    # "Apple Inc." is one of four words, its other single-word terms do not appear
+    assert relevance.at['AAPL', 'positive_relevance'] == pytest.approx(1 / 4)
+    # the reversed "Inc. Apple" does not match the phrase, "Exxon Mobil" alone is not "Exxon Mobil Corporation"
+    assert relevance.at['AAPL', 'negative_relevance'] == 0
+    assert relevance.at['XOM', 'negative_relevance'] == 0
+
+
+def test_contractions_and_ampersands_stay_one_token():
+    assert tokenize("Don't sell AT&T, it's fine.") == ["don't", 'sell', 'at&t', "it's", 'fine']
+    assert tokenize('oil & gas') == ['oil', '&', 'gas']
+
+    companies = COMPANIES.assign(Shortname=['Apple', 'Exxon', 'AT&T'])
+    relevance = _scores([("don't panic, it's only a dip", 'at&t cuts jobs')], companies).set_index('Symbol')
+    # the ticker T is not matched by the tails of "don't" or "it's"
+    assert relevance.at['T', 'positive_relevance'] == 0
+    assert relevance.at['T', 'negative_relevance'] == pytest.approx(1 / 3)
+
+
+def test_missing_headlines_score_zero():
+    relevance = _scores([(np.nan, 'apple crash'), ('', None)]).set_index('Symbol')
+    assert relevance['positive_relevance'].eq(0).all()
+    # Shortname and Longname are both "Apple", each counts once over the two words
+    assert relevance.loc['AAPL', 'negative_relevance'].tolist() == [1.0, 0.0]
+
+    present, word_counts = TermIndex(COMPANIES).match([np.nan, None, 'apple'])
+    assert word_counts.tolist() == [0, 0, 1]
+    assert present.sum(axis=1).tolist() == [0, 0, 1]
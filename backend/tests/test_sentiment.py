@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app.pipeline.sentiment import SentimentScorer
+from app.pipeline.synthetic import synthetic_news
+
+
+@pytest.fixture(scope='module')
+def headlines():
+    return synthetic_news(300)['headline'].tolist()
+
+
+def test_pooled_scores_match_serial_vader(headlines):
+    analyzer = SentimentIntensityAnalyzer()
+    expected = [analyzer.polarity_scores(headline)['compound'] for headline in headlines]
+
+    scores = SentimentScorer(cache_path=None, workers=2, chunk_size=50).compound(headlines)
+    np.testing.assert_array_equal(scores, expected)
+
+
+def test_second_scorer_reads_the_persisted_cache(headlines, tmp_path):
+    cache_path = str(tmp_path / 'headline_scores.parquet')
+    first = SentimentScorer(cache_path=cache_path, workers=1).compound(headlines)
+
+    scorer = SentimentScorer(cache_path=cache_path, workers=1)
+    scorer._score = lambda misses: pytest.fail(f'{len(misses)} headlines scored again')
+    np.testing.assert_array_equal(scorer.compound(headlines), first)
+    assert len(pd.read_parquet(cache_path)) == len(set(headlines))
+
+
+def test_missing_headlines_score_as_empty():
+    scores = SentimentScorer(cache_path=None, workers=1).compound([None, np.nan, '', 'great news'])
+    assert scores[:3].tolist() == [0.0, 0.0, 0.0]
+    assert scores[3] > 0
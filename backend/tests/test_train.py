@@ -0,0 +1,56 @@
+import numpy as np
+from pandas.testing import assert_frame_equal
+
+from app.model.train import SharedArrays, _map, _run_fold, backtest, design_matrix, train_models, walk_forward_folds
+
+
+def test_targets_are_the_next_row_of_the_same_symbol(dataset):
+    df, arrays, ranges = design_matrix(dataset['final_df'], group_by='Sector')
+
+    for symbol, rows in df.groupby('Symbol', observed=True):
+        rows = rows.sort_values('Date')
+        np.testing.assert_array_equal(arrays['y'][rows.index[:-1]], rows['Percentchange'].to_numpy()[1:])
+        np.testing.assert_array_equal(arrays['target_date'][rows.index[:-1]],
+                                      rows['Date'].to_numpy()[1:].astype('datetime64[D]').astype(np.int64))
+        # a symbol's last row has no next day, and a target date no fold can reach
+        assert np.isnan(arrays['y'][rows.index[-1]])
+        assert arrays['target_date'][rows.index[-1]] == np.iinfo(np.int64).max
+
+    # every group is one contiguous, date sorted block of rows
+    for group, (lo, hi) in ranges.items():
+        assert (df['group'].iloc[lo:hi] == group).all()
+        assert np.all(np.diff(arrays['date'][lo:hi]) >= 0)
+
+
+def test_folds_purge_training_rows_whose_target_is_in_the_test_year(dataset):
+    final_df = dataset['final_df']
+    _, arrays, ranges = design_matrix(final_df)
+    arrays['predictions'] = np.full(len(arrays['y']), np.nan)
+    start, end = walk_forward_folds(arrays['date'])[0]
+    lo, hi = ranges['__all__']
+
+    shared = SharedArrays(arrays)
+    try:
+        [result] = _map(_run_fold, [('__all__', lo, hi, start, end, 1.0)], shared, workers=1)
+    finally:
+        shared.close()
+
+    # each symbol's last day before the test year has its target inside it, so it is dropped from training
+    before = final_df['Date'].to_numpy().astype('datetime64[D]').astype(np.int64) < start
+    assert result['n_train'] == before.sum() - final_df['Symbol'].nunique()
+    assert result['n_test'] > 0
+
+
+def test_pooled_backtest_and_training_match_serial(dataset):
+    final_df = dataset['final_df']
+    serial_metrics, serial = backtest(final_df, group_by='Symbol', workers=1)
+    pooled_metrics, pooled = backtest(final_df, group_by='Symbol', workers=3)
+    assert serial['prediction'].notna().sum() > 0
+    assert_frame_equal(serial_metrics, pooled_metrics)
+    assert_frame_equal(serial, pooled)
+
+    serial_models = train_models(final_df, group_by='Sector', workers=1).models
+    pooled_models = train_models(final_df, group_by='Sector', workers=3).models
+    assert serial_models.keys() == pooled_models.keys()
+    for group, model in serial_models.items():
+        assert model.to_dict() == pooled_models[group].to_dict()